@@ -2,15 +2,17 @@
 Helper class for CloudWatch logging operations.
 """
 
-import boto3
+import json
+import time
 from botocore.exceptions import ClientError
+from helpers import _SESSION, _CLIENT_CONFIG
 
 
 class CloudWatch_Helper:
     """Helper class for CloudWatch operations."""
     
     def __init__(self, region_name='us-west-2'):
-        self.logs_client = boto3.client('logs', region_name=region_name)
+        self.logs_client = _SESSION.client('logs', region_name=region_name, config=_CLIENT_CONFIG)
     
     def create_log_group(self, log_group_name):
         """
@@ -29,24 +31,35 @@ class CloudWatch_Helper:
                 print(f"Error creating log group: {e}")
                 raise
     
-    def print_recent_logs(self, log_group_name, limit=10):
+    def print_recent_logs(self, log_group_name, limit=10, events_per_stream=5):
         """
         Print recent log events from a log group.
         
+        Events for all selected streams are fetched with a single Logs
+        Insights query, sorted newest first and capped at
+        ``limit * events_per_stream`` rows, instead of one get_log_events call
+        per stream. A very busy stream can take rows from quieter ones.
+        
         Args:
             log_group_name: Name of the log group
             limit: Maximum number of log streams to check
+            events_per_stream: Number of most recent events to print per stream
         """
         try:
             # Get recent log streams
-            response = self.logs_client.describe_log_streams(
-                logGroupName=log_group_name,
-                orderBy='LastEventTime',
-                descending=True,
-                limit=limit
-            )
+            paginator = self.logs_client.get_paginator('describe_log_streams')
+            log_streams = [
+                stream
+                for page in paginator.paginate(
+                    logGroupName=log_group_name,
+                    orderBy='LastEventTime',
+                    descending=True,
+                    PaginationConfig={'MaxItems': limit, 'PageSize': min(limit, 50)}
+                )
+                for stream in page.get('logStreams', [])
+            ]
             
-            if not response.get('logStreams'):
+            if not log_streams:
                 print("No log streams found in the log group.")
                 print("Permissions are correctly set for Amazon Bedrock logs.")
                 print("-" * 80)
@@ -55,20 +68,46 @@ class CloudWatch_Helper:
             print("Recent logs:")
             print("-" * 80)
             
-            for stream in response['logStreams']:
-                stream_name = stream['logStreamName']
+            # Query the latest events of all streams at once
+            stream_names = [stream['logStreamName'] for stream in log_streams]
+            query = (
+                "fields toMillis(@timestamp) as timestamp, @message, @logStream"
+                f" | filter @logStream in {json.dumps(stream_names)}"
+                " | sort @timestamp desc"
+                f" | limit {min(len(stream_names) * events_per_stream, 10000)}"
+            )
+            query_id = self.logs_client.start_query(
+                logGroupName=log_group_name,
+                startTime=min(stream.get('firstEventTimestamp', 0) for stream in log_streams) // 1000,
+                endTime=int(time.time()) + 1,
+                queryString=query
+            )['queryId']
+            
+            # Wait for the query to finish
+            while True:
+                response = self.logs_client.get_query_results(queryId=query_id)
+                if response['status'] not in ('Scheduled', 'Running'):
+                    break
+                time.sleep(1)
+            
+            if response['status'] != 'Complete':
+                print(f"Log query ended with status {response['status']}.")
+                return
+            
+            # Group newest-first rows by stream, in stream order
+            recent_events = {name: [] for name in stream_names}
+            for result in response['results']:
+                row = {field['field']: field['value'] for field in result}
+                events = recent_events.get(row.get('@logStream'))
+                if events is not None and len(events) < events_per_stream:
+                    events.append(row)
+            
+            for stream_name, events in recent_events.items():
                 print(f"\nLog Stream: {stream_name}")
                 
-                # Get log events
-                events_response = self.logs_client.get_log_events(
-                    logGroupName=log_group_name,
-                    logStreamName=stream_name,
-                    limit=5
-                )
-                
-                for event in events_response.get('events', []):
+                for event in reversed(events):
                     timestamp = event['timestamp']
-                    message = event['message']
+                    message = event['@message']
                     print(f"  [{timestamp}] {message}")
             
             print("-" * 80)
@@ -79,4 +118,3 @@ class CloudWatch_Helper:
             else:
                 print(f"Error retrieving logs: {e}")
                 raise
-
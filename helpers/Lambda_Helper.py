@@ -2,20 +2,24 @@
 Helper class for deploying and managing AWS Lambda functions.
 """
 
-import boto3
+import io
 import zipfile
 import os
 import json
 from botocore.exceptions import ClientError
+from helpers import _SESSION, _CLIENT_CONFIG
+
+# Files that are already compressed are stored as-is in the deployment zip
+STORED_EXTENSIONS = {'.whl', '.zip', '.gz', '.png', '.jpg'}
 
 
 class Lambda_Helper:
     """Helper class for Lambda function operations."""
     
     def __init__(self):
-        self.lambda_client = boto3.client('lambda', region_name='us-west-2')
-        self.iam_client = boto3.client('iam', region_name='us-west-2')
-        self.s3_client = boto3.client('s3', region_name='us-west-2')
+        self.lambda_client = _SESSION.client('lambda', config=_CLIENT_CONFIG)
+        self.iam_client = _SESSION.client('iam', config=_CLIENT_CONFIG)
+        self.s3_client = _SESSION.client('s3', config=_CLIENT_CONFIG)
         self.filter_rules_suffix = None
         self.lambda_environ_variables = {}
         self.deployed_function_name = None
@@ -25,22 +29,31 @@ class Lambda_Helper:
         Deploy a Lambda function from local files.
         
         Args:
-            file_list: List of files to include in deployment package
+            file_list: List of files to include in deployment package. A
+                directory (e.g. created with ``pip install --target``) is
+                added recursively, with its contents at the package root.
             function_name: Name of the Lambda function
             role_arn: IAM role ARN (optional, will create if not provided)
             handler: Handler function name (default: function_name.lambda_handler)
         """
         print("Zipping function...")
         
-        # Create zip file
-        zip_filename = f"{function_name}.zip"
-        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        # Create zip file in memory
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
             for file in file_list:
-                if os.path.exists(file):
-                    zipf.write(file, os.path.basename(file))
+                if os.path.isdir(file):
+                    for root, _, files in os.walk(file):
+                        for name in files:
+                            path = os.path.join(root, name)
+                            self._write_to_zip(zipf, path, os.path.relpath(path, file))
+                    print(f"  Added {file}/")
+                elif os.path.exists(file):
+                    self._write_to_zip(zipf, file, os.path.basename(file))
                     print(f"  Added {file}")
                 else:
                     print(f"  Warning: {file} not found")
+        zip_bytes = buffer.getvalue()
         
         # Check if function exists
         print("Looking for existing function...")
@@ -49,11 +62,10 @@ class Lambda_Helper:
             print(f"Function {function_name} exists. Updating...")
             
             # Update function code
-            with open(zip_filename, 'rb') as f:
-                self.lambda_client.update_function_code(
-                    FunctionName=function_name,
-                    ZipFile=f.read()
-                )
+            self.lambda_client.update_function_code(
+                FunctionName=function_name,
+                ZipFile=zip_bytes
+            )
             
             # Update environment variables if provided
             if self.lambda_environ_variables:
@@ -82,17 +94,16 @@ class Lambda_Helper:
                         handler = f"{function_name}.lambda_handler"
                 
                 # Create function
-                with open(zip_filename, 'rb') as f:
-                    response = self.lambda_client.create_function(
-                        FunctionName=function_name,
-                        Runtime='python3.11',
-                        Role=role_arn,
-                        Handler=handler,
-                        Code={'ZipFile': f.read()},
-                        Environment={'Variables': self.lambda_environ_variables} if self.lambda_environ_variables else {},
-                        Timeout=300,
-                        MemorySize=512
-                    )
+                response = self.lambda_client.create_function(
+                    FunctionName=function_name,
+                    Runtime='python3.11',
+                    Role=role_arn,
+                    Handler=handler,
+                    Code={'ZipFile': zip_bytes},
+                    Environment={'Variables': self.lambda_environ_variables} if self.lambda_environ_variables else {},
+                    Timeout=300,
+                    MemorySize=512
+                )
                 
                 print(f"Function {function_name} created: {response['FunctionArn']}")
             else:
@@ -100,16 +111,15 @@ class Lambda_Helper:
         
         self.deployed_function_name = function_name
         
-        # Clean up zip file
-        if os.path.exists(zip_filename):
-            os.remove(zip_filename)
-        
         print("Done.")
     
     def add_lambda_trigger(self, bucket_name, function_name=None):
         """
         Add S3 event trigger to Lambda function.
         
+        The trigger is filtered on filter_rules_suffix, so S3 only invokes
+        the function for matching keys (e.g. "-transcript.json" or ".mp3").
+        
         Args:
             bucket_name: S3 bucket name
             function_name: Lambda function name (uses deployed function if not provided)
@@ -120,6 +130,9 @@ class Lambda_Helper:
         if not function_name:
             raise ValueError("Function name must be provided or set via deploy_function")
         
+        if not self.filter_rules_suffix:
+            raise ValueError("filter_rules_suffix must be set so S3 only invokes the function for matching keys")
+        
         print(f"Using function name of deployed function: {function_name}")
         
         # Get function ARN
@@ -157,15 +170,11 @@ class Lambda_Helper:
         # Configure S3 event notification
         bucket_config = self.s3_client.get_bucket_notification_configuration(Bucket=bucket_name)
         
-        # Prepare Lambda configuration
+        # Prepare Lambda configuration, filtered by key suffix
         lambda_config = {
             'LambdaFunctionArn': function_arn,
-            'Events': ['s3:ObjectCreated:*']
-        }
-        
-        # Add filter if suffix is specified
-        if self.filter_rules_suffix:
-            lambda_config['Filter'] = {
+            'Events': ['s3:ObjectCreated:*'],
+            'Filter': {
                 'Key': {
                     'FilterRules': [
                         {
@@ -175,24 +184,50 @@ class Lambda_Helper:
                     ]
                 }
             }
+        }
         
-        # Update notification configuration
-        if 'LambdaFunctionConfigurations' not in bucket_config:
-            bucket_config['LambdaFunctionConfigurations'] = []
+        # Replace any existing configuration for this function
+        configs = bucket_config.get('LambdaFunctionConfigurations', [])
+        existing = [c for c in configs if c['LambdaFunctionArn'] == function_arn]
+        if existing and 'Id' in existing[0]:
+            lambda_config['Id'] = existing[0]['Id']
         
-        # Check if configuration already exists
-        existing = [c for c in bucket_config['LambdaFunctionConfigurations'] 
-                   if c['LambdaFunctionArn'] == function_arn]
+        updated = [c for c in configs if c['LambdaFunctionArn'] != function_arn]
+        updated.append(lambda_config)
         
-        if not existing:
-            bucket_config['LambdaFunctionConfigurations'].append(lambda_config)
-            self.s3_client.put_bucket_notification_configuration(
-                Bucket=bucket_name,
-                NotificationConfiguration=bucket_config
-            )
-            print(f"Trigger added for {bucket_name} -> {function_name}")
-        else:
+        # Skip the rewrite if the bucket already has the desired configuration
+        if self._canonical_lambda_configs(configs) == self._canonical_lambda_configs(updated):
             print(f"Trigger already exists for {bucket_name} -> {function_name}")
+            return
+        
+        bucket_config.pop('ResponseMetadata', None)
+        bucket_config['LambdaFunctionConfigurations'] = updated
+        self.s3_client.put_bucket_notification_configuration(
+            Bucket=bucket_name,
+            NotificationConfiguration=bucket_config
+        )
+        action = "updated" if existing else "added"
+        print(f"Trigger {action} for {bucket_name} -> {function_name}")
+    
+    def _canonical_lambda_configs(self, configs):
+        """Serialize Lambda notification configs for comparison, ignoring Ids and order."""
+        canonical = []
+        for config in configs:
+            rules = config.get('Filter', {}).get('Key', {}).get('FilterRules', [])
+            canonical.append(json.dumps({
+                'LambdaFunctionArn': config['LambdaFunctionArn'],
+                'Events': sorted(config['Events']),
+                # S3 returns rule names capitalized ('Suffix')
+                'FilterRules': sorted((r['Name'].lower(), r['Value']) for r in rules)
+            }, sort_keys=True))
+        return sorted(canonical)
+    
+    def _write_to_zip(self, zipf, path, arcname):
+        """Add a file to the zip, skipping compression for compressed formats."""
+        if os.path.splitext(path)[1].lower() in STORED_EXTENSIONS:
+            zipf.write(path, arcname, compress_type=zipfile.ZIP_STORED)
+        else:
+            zipf.write(path, arcname)
     
     def _create_basic_role(self, function_name):
         """Create a basic IAM role for Lambda execution."""
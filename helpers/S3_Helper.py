@@ -3,16 +3,16 @@ Helper class for S3 operations.
 """
 
 import os
-import boto3
 from datetime import datetime
 from botocore.exceptions import ClientError
+from helpers import _SESSION, _CLIENT_CONFIG
 
 
 class S3_Helper:
     """Helper class for S3 operations."""
     
     def __init__(self, region_name='us-west-2'):
-        self.s3_client = boto3.client('s3', region_name=region_name)
+        self.s3_client = _SESSION.client('s3', region_name=region_name, config=_CLIENT_CONFIG)
     
     def upload_file(self, bucket_name, file_path, s3_key=None):
         """
@@ -55,27 +55,50 @@ class S3_Helper:
                 print(f"Error downloading object: {e}")
             raise
     
-    def list_objects(self, bucket_name, prefix=''):
+    def iter_objects(self, bucket_name, prefix='', start_after=None, suffix=None):
+        """
+        Iterate over objects in an S3 bucket, one page at a time.
+        
+        Args:
+            bucket_name: Name of the S3 bucket
+            prefix: Optional prefix to filter objects (applied by S3)
+            start_after: Optional key to start listing after (applied by S3)
+            suffix: Optional key suffix to filter objects
+            
+        Yields:
+            dict: Object summaries from list_objects_v2
+        """
+        kwargs = {'Bucket': bucket_name, 'Prefix': prefix}
+        if start_after:
+            kwargs['StartAfter'] = start_after
+        
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(**kwargs, PaginationConfig={'PageSize': 1000}):
+            for obj in page.get('Contents', []):
+                # S3 has no server-side suffix filter
+                if suffix is None or obj['Key'].endswith(suffix):
+                    yield obj
+    
+    def list_objects(self, bucket_name, prefix='', start_after=None, suffix=None):
         """
         List objects in an S3 bucket.
         
         Args:
             bucket_name: Name of the S3 bucket
             prefix: Optional prefix to filter objects
+            start_after: Optional key to start listing after
+            suffix: Optional key suffix to filter objects
         """
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=bucket_name,
-                Prefix=prefix
-            )
+            found = False
+            for obj in self.iter_objects(bucket_name, prefix, start_after, suffix):
+                found = True
+                # Skip directory markers
+                if not obj['Key'].endswith('/'):
+                    last_modified = obj['LastModified']
+                    print(f"Object: {obj['Key']}, Created on: {last_modified}")
             
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    # Skip directory markers
-                    if not obj['Key'].endswith('/'):
-                        last_modified = obj['LastModified']
-                        print(f"Object: {obj['Key']}, Created on: {last_modified}")
-            else:
+            if not found:
                 print(f"No objects found in bucket '{bucket_name}' with prefix '{prefix}'")
                 
         except ClientError as e:
@@ -8,5 +8,18 @@ This package contains helper classes for:
 - CloudWatch logging
 """
 
+import boto3
+from botocore.config import Config
+
 __version__ = "1.0.0"
 
+# Shared by all helpers so botocore service data is loaded only once
+_SESSION = boto3.session.Session(region_name='us-west-2')
+
+# Adaptive retries rate-limit the client on throttling errors
+# (e.g. DescribeLogStreams) instead of failing the caller
+_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    tcp_keepalive=True
+)
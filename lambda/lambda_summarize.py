@@ -2,22 +2,90 @@
 AWS Lambda function for automatic transcript summarization.
 
 This function is triggered when a transcript JSON file is uploaded to an S3 bucket.
-It extracts the transcript text, generates a prompt using a Jinja2 template,
+It extracts the transcript text, generates a prompt from a text template,
 and uses Amazon Bedrock to generate a summary with sentiment analysis and
 issue extraction.
 
+Environment Variables:
+    MAX_TRANSCRIPT_BYTES: Largest transcript file to summarize (default: 50 MB)
+    PREWARM_BEDROCK: Set to "true" to open the Bedrock connection during
+        INIT (requires bedrock:ListAsyncInvokes)
+
 IAM Permissions Required:
     - bedrock:InvokeModel
     - s3:GetObject
     - s3:PutObject
+    - bedrock:ListAsyncInvokes (only with PREWARM_BEDROCK)
 """
 
 import boto3
+import ijson
 import json 
-from jinja2 import Template
+import orjson
+import os
+import re
+from botocore.config import Config
 
 s3_client = boto3.client('s3')
-bedrock_runtime = boto3.client('bedrock-runtime', 'us-west-2')
+# Bounded so an unreachable endpoint fails fast instead of stalling INIT
+bedrock_runtime = boto3.client(
+    'bedrock-runtime', 'us-west-2',
+    config=Config(connect_timeout=2, retries={'mode': 'standard', 'max_attempts': 3})
+)
+
+MODEL_ID = "us.amazon.nova-lite-v1:0"
+
+# Transcript files outside these sizes (in bytes) are skipped without reading
+MIN_TRANSCRIPT_BYTES = 100
+MAX_TRANSCRIPT_BYTES = int(os.environ.get('MAX_TRANSCRIPT_BYTES', 50 * 1024 * 1024))
+TOPICS = ['charges', 'location', 'availability']
+
+# Static part of the Bedrock request body, shared by every invocation
+INFERENCE_CONFIG = {
+    "maxTokens": 2048,
+    "temperature": 0,
+    "topP": 0.9
+}
+# Pre-serialized as the closing part of the JSON body: ,"inferenceConfig":{...}}
+_BODY_TAIL = b',' + orjson.dumps({"inferenceConfig": INFERENCE_CONFIG})[1:]
+
+# Matches ``{{ name }}`` placeholders in the prompt template
+_PLACEHOLDER = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+def _to_format_string(template_string):
+    """
+    Convert ``{{ name }}`` placeholders to ``str.format`` fields.
+    
+    Raises:
+        ValueError: If the template uses Jinja block syntax or placeholders
+            other than ``transcript`` and ``topics``
+    """
+    if '{%' in template_string:
+        raise ValueError(
+            "prompt_template.txt uses Jinja block syntax ({% ... %}); "
+            "only {{transcript}} and {{topics}} placeholders are supported"
+        )
+    
+    pieces = _PLACEHOLDER.split(template_string)
+    unknown = set(pieces[1::2]) - {'transcript', 'topics'}
+    if unknown:
+        raise ValueError(
+            f"prompt_template.txt has unsupported placeholders: {', '.join(sorted(unknown))}"
+        )
+    
+    # Even pieces are literal text, odd pieces are placeholder names
+    pieces[0::2] = [p.replace('{', '{{').replace('}', '}}') for p in pieces[0::2]]
+    pieces[1::2] = [f'{{{name}}}' for name in pieces[1::2]]
+    return ''.join(pieces)
+
+
+# Read the prompt template once per container
+# Note: In Lambda, the template file should be included in the deployment package
+with open('prompt_template.txt', "r") as file:
+    _TEMPLATE = _to_format_string(file.read())
+
+_TOPICS_TEXT = '\n'.join(f" - `{topic}`" for topic in TOPICS)
 
 
 def lambda_handler(event, context):
@@ -34,7 +102,8 @@ def lambda_handler(event, context):
     bucket = event['Records'][0]['s3']['bucket']['name']
     key = event['Records'][0]['s3']['object']['key']
     
-    # One of a few different checks to ensure we don't end up in a recursive loop.
+    # The S3 trigger filters on key suffix; this check is a second guard
+    # against a recursive loop if the trigger is configured without it.
     if "-transcript.json" not in key: 
         print(f"This demo only works with *-transcript.json files. Received: {key}")
         return {
@@ -42,13 +111,23 @@ def lambda_handler(event, context):
             'body': json.dumps(f"Skipping file {key} - not a transcript JSON file")
         }
     
+    # The event already carries the object size, so no HEAD request is needed
+    size = event['Records'][0]['s3']['object'].get('size')
+    if size is not None and not MIN_TRANSCRIPT_BYTES <= size <= MAX_TRANSCRIPT_BYTES:
+        print(f"Transcript size {size} bytes is out of range. Received: {key}")
+        return {
+            'statusCode': 200,
+            'body': json.dumps(f"Skipping file {key} - size {size} bytes out of range")
+        }
+    
     try: 
         # Read the transcript JSON file from S3
         response = s3_client.get_object(Bucket=bucket, Key=key)
-        file_content = response['Body'].read().decode('utf-8')
         
-        # Extract transcript text with speaker labels
-        transcript = extract_transcript_from_textract(file_content)
+        # Extract transcript text with speaker labels, streaming the body
+        transcript = extract_transcript_from_textract(response['Body'])
+        if not transcript:
+            raise ValueError(f"No transcript items found in {key}")
 
         print(f"Successfully read file {key} from bucket {bucket}.")
         print(f"Transcript length: {len(transcript)} characters")
@@ -57,11 +136,13 @@ def lambda_handler(event, context):
         summary = bedrock_summarisation(transcript)
         
         # Save results to S3
+        body_bytes = summary.encode('utf-8')
         s3_client.put_object(
             Bucket=bucket,
             Key='results.txt',
-            Body=summary,
-            ContentType='text/plain'
+            Body=body_bytes,
+            ContentLength=len(body_bytes),
+            ContentType='text/plain; charset=utf-8'
         )
         
         print(f"Summary saved to {bucket}/results.txt")
@@ -81,40 +162,43 @@ def lambda_handler(event, context):
     }
 
 
-def extract_transcript_from_textract(file_content):
+def extract_transcript_from_textract(body):
     """
     Extract formatted transcript text from Transcribe JSON output.
     
+    The JSON is parsed incrementally with ijson, so only one item is held
+    in memory at a time instead of the whole document.
+    
     Args:
-        file_content: JSON string from AWS Transcribe
+        body: Binary file-like object (e.g. S3 StreamingBody) with the
+            JSON output from AWS Transcribe
         
     Returns:
         str: Formatted transcript with speaker labels
     """
-    transcript_json = json.loads(file_content)
-
-    output_text = ""
+    parts = []
+    append = parts.append
     current_speaker = None
 
-    items = transcript_json['results']['items']
-
     # Iterate through the content word by word:
-    for item in items:
-        speaker_label = item.get('speaker_label', None)
+    for item in ijson.items(body, 'results.items.item', use_float=True):
+        speaker_label = item.get('speaker_label')
         content = item['alternatives'][0]['content']
+        is_punctuation = item['type'] == 'punctuation'
         
-        # Start the line with the speaker label:
+        # Start the line with the speaker label (punctuation attaches to it):
         if speaker_label is not None and speaker_label != current_speaker:
             current_speaker = speaker_label
-            output_text += f"\n{current_speaker}: "
+            append(f"\n{current_speaker}:" if is_punctuation else f"\n{current_speaker}: ")
         
         # Add the speech content:
-        if item['type'] == 'punctuation':
-            output_text = output_text.rstrip()  # Remove the last space
+        elif is_punctuation and parts and parts[-1] == ' ':
+            parts.pop()  # Remove the last space
         
-        output_text += f"{content} "
+        append(content)
+        append(' ')
         
-    return output_text
+    return ''.join(parts)
 
 
 def bedrock_summarisation(transcript):
@@ -127,47 +211,49 @@ def bedrock_summarisation(transcript):
     Returns:
         str: JSON-formatted summary with sentiment and issues
     """
-    # Read prompt template
-    # Note: In Lambda, the template file should be included in the deployment package
-    with open('prompt_template.txt', "r") as file:
-        template_string = file.read()
-
-    # Prepare template data
-    data = {
-        'transcript': transcript,
-        'topics': ['charges', 'location', 'availability']
-    }
-    
-    # Render prompt using Jinja2 template
-    template = Template(template_string)
-    prompt = template.render(data)
+    # Render prompt from the preloaded template
+    prompt = _TEMPLATE.format(
+        transcript=transcript,
+        topics=_TOPICS_TEXT
+    )
     
     print(f"Generated prompt length: {len(prompt)} characters")
     
     # Invoke Bedrock model
     kwargs = {
-        "modelId": "us.amazon.nova-lite-v1:0",
+        "modelId": MODEL_ID,
         "contentType": "application/json",
         "accept": "*/*",
-        "body": json.dumps(
-            {
-                "messages": [{"role": "user", "content": [{"text": prompt}]}],
-                "inferenceConfig": {
-                    "maxTokens": 2048,
-                    "temperature": 0,
-                    "topP": 0.9
-                }
-            }
-        )
+        # Serialize only the messages and splice in the static tail
+        "body": orjson.dumps(
+            {"messages": [{"role": "user", "content": [{"text": prompt}]}]}
+        )[:-1] + _BODY_TAIL
     }
     
     response = bedrock_runtime.invoke_model(**kwargs)
 
     # Parse response
-    response_body = json.loads(response.get('body').read())
+    response_body = orjson.loads(response.get('body').read())
     content_list = response_body["output"]["message"]["content"]
     text_block = next((item for item in content_list if "text" in item), None)
     summary = text_block["text"] if text_block else ""
     
     return summary
 
+
+def _prewarm_bedrock_connection():
+    """
+    Open the Bedrock runtime connection during Lambda INIT.
+    
+    Any request, even one rejected for missing permissions, completes the
+    TLS handshake and leaves the connection in botocore's pool, so the first
+    invoke_model call does not pay for it. No model is invoked.
+    """
+    try:
+        bedrock_runtime.list_async_invokes(maxResults=1)
+    except Exception as e:
+        print(f"Bedrock prewarm skipped: {e}")
+
+
+if os.environ.get('PREWARM_BEDROCK', '').lower() == 'true':
+    _prewarm_bedrock_connection()
@@ -38,8 +38,8 @@ def lambda_handler(event, context):
     bucket = event['Records'][0]['s3']['bucket']['name']
     key = event['Records'][0]['s3']['object']['key']
 
-    # One of a few different checks to ensure we don't end up in a recursive loop.
-    # In production, you might want to check file extension or other criteria
+    # The S3 trigger filters on key suffix; this check is a second guard
+    # against a recursive loop if the trigger is configured without it.
     if key != "dialog.mp3": 
         print(f"This demo only works with dialog.mp3. Received: {key}")
         return {